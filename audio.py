@@ -0,0 +1,55 @@
+import json
+import os
+
+import streamlit as st
+import streamlit.components.v1 as components
+from streamlit.runtime import Runtime
+
+# zero-height component that owns the client-side audio queue and reports finished turns and clips
+_audio_queue = components.declare_component(
+    "audio_queue",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "audio_queue"),
+)
+
+# zero-height component that adds the earcons and space bar shortcut to the speech_to_text button
+_recorder_hotkeys = components.declare_component(
+    "recorder_hotkeys",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "recorder_hotkeys"),
+)
+
+
+def audio_queue(key: str = "audio_queue"):
+    """Render the audio queue; returns the id of the last turn, or reported clip, that finished playing."""
+    return _audio_queue(key=key, default=None)
+
+
+def recorder_hotkeys(key: str = "recorder_hotkeys"):
+    """Render the recorder shortcuts; they are set up once per page, later reruns send nothing new."""
+    _recorder_hotkeys(key=key, default=None)
+
+
+def _enqueue(clip: dict):
+    components.html(f"""
+        <script>
+            window.parent.blvAudioQueue.enqueue({json.dumps(clip)});
+        </script>
+        """, height=0, width=0)
+
+
+def enqueue_audio(audio: bytes, clip_id: str, report: bool = False):
+    """Queue an mp3 for playback in the browser without waiting for it to finish.
+
+    With `report` the queue sends `clip_id` back through `audio_queue` once the clip has played.
+    The bytes stay in memory with Streamlit's media file manager (scoped to this session, the same
+    place st.audio keeps them) and the browser fetches them by URL.
+    """
+    url = Runtime.instance().media_file_mgr.add(audio, "audio/mpeg", f"audio_queue.{clip_id}")
+    base_path = st.get_option("server.baseUrlPath").strip("/")
+    if base_path:
+        url = f"/{base_path}{url}"
+    _enqueue({"id": clip_id, "src": url, "last": False, "report": report})
+
+
+def end_turn(turn_id: str):
+    """Mark the end of a turn; the queue reports `turn_id` back once everything before it has played."""
+    _enqueue({"id": turn_id, "last": True})
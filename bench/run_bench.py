@@ -0,0 +1,189 @@
+# offline benchmark of the turn pipeline, e.g.
+#   python bench/run_bench.py --sessions 16 --turns 5 --error-rate 0.05
+#   python bench/run_bench.py --sessions 32 --turns 3 --workers 4 --queue 4 --double-press-rate 0.2
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+
+# run from anywhere: the app modules live one directory up
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from history import ConversationHistory  # noqa: E402
+from http_client import HTTPClient  # noqa: E402
+from latency_report import print_report  # noqa: E402
+from telemetry import turn_logger  # noqa: E402
+from tts import TTSCache  # noqa: E402
+from turn import TurnPipeline  # noqa: E402
+from workers import Overloaded, SessionBusy, TurnWorkers  # noqa: E402
+
+from stub_server import StubConfig, start_stub_server  # noqa: E402
+
+# stands in for the app's system prompt, about the same length
+SYSTEM_PROMPT = "You are a chatbot that interacts with blind and low-vision users. " * 10
+
+
+class RecordCollector(logging.Handler):
+    """Keeps the turn records the pipeline emits instead of writing them to turns.jsonl."""
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(json.loads(record.getMessage()))
+
+
+def write_secrets(directory: str, base_url: str, args):
+    # the same keys app.py reads, pointing at the stand-in server
+    os.makedirs(os.path.join(directory, ".streamlit"))
+    with open(os.path.join(directory, ".streamlit", "secrets.toml"), "w") as f:
+        f.write(f'OPENAI_GPT4O_ENDPOINT = "{base_url}/gpt"\n')
+        f.write(f'OPENAI_TTS_ENDPOINT = "{base_url}/tts"\n')
+        f.write('OPENAI_API_KEY = "benchmark"\n')
+        f.write(f'STREAM_RESPONSES = {"true" if args.stream else "false"}\n')
+        f.write(f'TTS_CACHE_DIR = "{os.path.join(directory, "tts_cache")}"\n')
+        # pool sizes only when given, so the app's defaults apply otherwise
+        for key, value in [("TURN_WORKERS", args.workers), ("TURN_QUEUE", args.queue),
+                           ("GPT_CONCURRENCY", args.gpt_concurrency), ("TTS_CONCURRENCY", args.tts_concurrency)]:
+            if value is not None:
+                f.write(f"{key} = {value}\n")
+
+
+def build(cue_audio: bytes):
+    # mirrors the setup in app.py, reading the same secrets with the same defaults
+    import streamlit as st
+
+    client = HTTPClient(st.secrets.get("HTTP_CONNECT_TIMEOUT", 3.05), st.secrets.get("HTTP_READ_TIMEOUT", 30), st.secrets.get("HTTP_RETRIES", 3))
+    cache = TTSCache(st.secrets.get("TTS_CACHE_DIR", "tts_cache"), st.secrets.get("TTS_CACHE_MEMORY_ITEMS", 256),
+                     st.secrets.get("TTS_CACHE_MAX_BYTES", 100 * 1024 * 1024))
+    pipeline = TurnPipeline(client, cache, st.secrets["OPENAI_GPT4O_ENDPOINT"], st.secrets["OPENAI_TTS_ENDPOINT"],
+                            st.secrets["OPENAI_API_KEY"], cue_audio, st.secrets.get("STREAM_RESPONSES", True),
+                            st.secrets.get("GPT_CONCURRENCY", 8), st.secrets.get("TTS_CONCURRENCY", 16))
+    pipeline.prepare_wait_cue()
+    workers = TurnWorkers(st.secrets.get("TURN_WORKERS", 8), st.secrets.get("TURN_QUEUE", 16))
+    return pipeline, workers
+
+
+def run_session(pipeline: TurnPipeline, workers: TurnWorkers, utterances: list, turns: int, offset: int, think_seconds: float,
+                double_press_rate: float, outcomes: list, audio_bytes: list):
+    # one simulated user, submitting turns the way the speech_to_text callback in app.py does
+    session_id = str(uuid.uuid4())
+    history = ConversationHistory(SYSTEM_PROMPT, pipeline.summarize)
+    for i in range(turns):
+        text = utterances[(offset + i) % len(utterances)]
+        stt_at = time.perf_counter()
+
+        def answer(job):
+            pipeline.run(job.turn_id, history, text, job.enqueue, job.end_turn, stt_at)
+
+        jobs = []
+        for press in range(2 if random.random() < double_press_rate else 1):
+            try:
+                jobs.append(workers.submit(session_id, str(uuid.uuid4()), answer))
+                outcomes.append("submitted")
+            except SessionBusy:
+                outcomes.append("ignored")
+            except Overloaded:
+                outcomes.append("overloaded")
+                wait_audio = pipeline.wait_cue()
+                if wait_audio is not None:
+                    audio_bytes.append(len(wait_audio))
+        for job in jobs:
+            job.future.result()
+            audio_bytes.extend(len(audio) for audio, _ in job.clips())
+        time.sleep(think_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the turn pipeline against local stand-in GPT/TTS servers.")
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent simulated sessions")
+    parser.add_argument("--turns", type=int, default=5, help="turns per session")
+    parser.add_argument("--utterances", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "utterances.txt"))
+    parser.add_argument("--think-ms", type=float, default=0, help="pause between the turns of a session")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=True, help="streamed GPT responses")
+    parser.add_argument("--gpt-ttft-ms", type=float, default=400, help="median GPT time to first token")
+    parser.add_argument("--gpt-token-ms", type=float, default=15, help="median delay between streamed tokens")
+    parser.add_argument("--tts-ms", type=float, default=300, help="median TTS latency")
+    parser.add_argument("--sigma", type=float, default=0.3, help="spread of the log-normal latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 429/503")
+    parser.add_argument("--sentences", type=int, default=3, help="sentences per reply")
+    parser.add_argument("--workers", type=int, help="turn worker threads (TURN_WORKERS)")
+    parser.add_argument("--queue", type=int, help="turns waiting for a worker before shedding (TURN_QUEUE)")
+    parser.add_argument("--gpt-concurrency", type=int, help="GPT requests in flight (GPT_CONCURRENCY)")
+    parser.add_argument("--tts-concurrency", type=int, help="TTS requests in flight (TTS_CONCURRENCY)")
+    parser.add_argument("--double-press-rate", type=float, default=0.0, help="fraction of turns submitted twice in a row")
+    parser.add_argument("--mp3", default=os.path.join(ROOT, "feedback_response.mp3"), help="canned TTS payload")
+    args = parser.parse_args()
+
+    with open(args.utterances, encoding="utf-8") as f:
+        utterances = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    with open(args.mp3, "rb") as f:
+        mp3 = f.read()
+
+    config = StubConfig(args.gpt_ttft_ms, args.gpt_token_ms, args.tts_ms, args.sigma, args.error_rate, args.sentences, mp3)
+    server, base_url = start_stub_server(config)
+    workdir = tempfile.mkdtemp(prefix="blv-bench-")
+    write_secrets(workdir, base_url, args)
+    os.chdir(workdir)
+    pipeline, workers = build(mp3)
+
+    collector = RecordCollector()
+    turn_logger.addHandler(collector)
+    turn_logger.setLevel(logging.INFO)
+    turn_logger.propagate = False
+
+    # sample the thread count while the sessions run
+    peak_threads = threading.active_count()
+    running = True
+
+    def sample_threads():
+        nonlocal peak_threads
+        while running:
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.01)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+
+    tracemalloc.start()
+    audio_bytes = []
+    outcomes = []
+    sessions = [threading.Thread(target=run_session, args=(pipeline, workers, utterances, args.turns, i, args.think_ms / 1000,
+                                                           args.double_press_rate, outcomes, audio_bytes))
+                for i in range(args.sessions)]
+    start = time.perf_counter()
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+    elapsed = time.perf_counter() - start
+    running = False
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    server.shutdown()
+
+    records = collector.records
+    errors = sum(1 for record in records if record.get("error"))
+    print(f"{args.sessions} sessions x {args.turns} turns, stream={args.stream}, error rate={args.error_rate}")
+    print(f"turns: {len(records)} ({errors} failed) in {elapsed:.2f}s = {len(records) / elapsed:.2f} turns/s")
+    counts = Counter(outcomes)
+    print(f"submissions: {counts['submitted']} accepted, {counts['ignored']} ignored (session busy), {counts['overloaded']} shed (overloaded)")
+    print(f"audio clips: {len(audio_bytes)}, {sum(audio_bytes) / 1024:.0f} KiB")
+    print(f"peak threads: {peak_threads}")
+    print(f"peak traced memory: {peak_traced / 1024 / 1024:.1f} MiB, max RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
+    print_report(records)
+
+
+if __name__ == "__main__":
+    main()
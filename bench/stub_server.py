@@ -0,0 +1,124 @@
+import itertools
+import json
+import math
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# canned reply sentences, a reply is a few of them so the TTS sees realistic sentence counts
+REPLY_SENTENCES = [
+    "Sure, I can help with that.",
+    "I found a few options that match what you asked for.",
+    "The first one is a small hotel close to the city center.",
+    "It costs one hundred and twenty euros a night, breakfast included.",
+    "Would you like me to book it for you?",
+    "I have booked it and sent the confirmation to your email.",
+]
+
+
+class StubConfig:
+    """Latency and failure behaviour of the stand-in GPT and TTS endpoints.
+
+    Latencies are log-normal with the given median in milliseconds and spread `sigma`.
+    """
+
+    def __init__(self, gpt_ttft_ms: float = 400, gpt_token_ms: float = 15, tts_ms: float = 300, sigma: float = 0.3,
+                 error_rate: float = 0.0, sentences: int = 3, mp3: bytes = b""):
+        self.gpt_ttft_ms = gpt_ttft_ms
+        self.gpt_token_ms = gpt_token_ms
+        self.tts_ms = tts_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.sentences = sentences
+        self.mp3 = mp3
+
+
+def sample_seconds(median_ms: float, sigma: float) -> float:
+    if median_ms <= 0:
+        return 0
+    return random.lognormvariate(math.log(median_ms / 1000), sigma)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so connection pooling shows up in the numbers
+    config: StubConfig
+    requests_served = itertools.count()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        number = next(self.requests_served)
+        if random.random() < self.config.error_rate:
+            # rate limited or overloaded, the way the real endpoints fail under load
+            status = random.choice([429, 503])
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/gpt"):
+            self.chat_completion(payload, number)
+        elif self.path.startswith("/tts"):
+            self.speech()
+        else:
+            self.send_error(404)
+
+    def chat_completion(self, payload: dict, number: int):
+        # rotate through the canned sentences and end on a unique one, so the TTS cache only helps with common phrases
+        start = number % len(REPLY_SENTENCES)
+        reply = " ".join(REPLY_SENTENCES[(start + i) % len(REPLY_SENTENCES)] for i in range(self.config.sentences))
+        reply += f" Reference number {number}."
+        time.sleep(sample_seconds(self.config.gpt_ttft_ms, self.config.sigma))
+        if not payload.get("stream"):
+            body = json.dumps({"choices": [{"message": {"role": "assistant", "content": reply}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self.write_chunk(b'data: {"choices": []}\n\n')
+        for token in reply.split(" "):
+            chunk = {"choices": [{"delta": {"content": token + " "}}]}
+            self.write_chunk(f"data: {json.dumps(chunk)}\n\n".encode())
+            time.sleep(sample_seconds(self.config.gpt_token_ms, self.config.sigma))
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def speech(self):
+        time.sleep(sample_seconds(self.config.tts_ms, self.config.sigma))
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(self.config.mp3)))
+        self.end_headers()
+        self.wfile.write(self.config.mp3)
+
+    def write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # clients hanging up on a kept-alive connection is expected, not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_stub_server(config: StubConfig, host: str = "127.0.0.1", port: int = 0):
+    """Serve the stand-in endpoints on a background thread; returns the server and its base URL."""
+    handler = type("ConfiguredStubHandler", (StubHandler,), {"config": config})
+    server = StubServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
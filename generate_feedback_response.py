@@ -1,23 +1,27 @@
 import requests
 import streamlit as st
+from http_client import HTTPClient
+from tts import TTSCache, text_to_speech
 
 API_TTS_ENDPOINT = st.secrets["OPENAI_TTS_ENDPOINT"]
+TTS_CACHE_DIR = st.secrets.get("TTS_CACHE_DIR", "tts_cache")
+PHRASE_BANK = st.secrets.get("PHRASE_BANK", "phrase_bank.txt")
+
+# pre-synthesize common utterances at deploy time so the app finds them in the cache
+client = HTTPClient()
+cache = TTSCache(TTS_CACHE_DIR)
+with open(PHRASE_BANK, encoding="utf-8") as f:
+    phrases = [line.strip() for line in f if line.strip() and not line.startswith("#")]
 
 try:
-    headers = {
-        "Content-Type": "application/json",
-        "api-key": st.secrets["OPENAI_API_KEY"],
-    }
-    payload = {
-        "model": "tts-1",
-        "voice": "alloy",
-        "input": "Generating the response.",
-    }
-    audio_response = requests.post(API_TTS_ENDPOINT, headers=headers, json=payload)
-    audio_response.raise_for_status()  # Will raise an HTTPError if the HTTP request returned an unsuccessful status code
+    audio = text_to_speech(client, API_TTS_ENDPOINT, st.secrets["OPENAI_API_KEY"], "Generating the response.", cache=cache)
+    for phrase in phrases:
+        text_to_speech(client, API_TTS_ENDPOINT, st.secrets["OPENAI_API_KEY"], phrase, cache=cache)
 except requests.RequestException as e:
     raise SystemExit(f"Failed to make the request. Error: {e}")
 
-# save output to mp3 file
+# save the feedback cue to mp3 file
 with open("feedback_response.mp3", "wb") as fout:
-    fout.write(audio_response.content)
\ No newline at end of file
+    fout.write(audio)
+
+print(f"Phrase bank ready: {len(phrases)} phrases, cache {cache.stats()}")
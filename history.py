@@ -0,0 +1,98 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = "Summarize the conversation below between a blind or low-vision user and their assistant in a few sentences. Keep every detail the assistant may need later, such as names, dates, places, bookings and the user's preferences. If there is an earlier summary, merge it into the new one."
+
+
+def count_tokens(message: dict) -> int:
+    # roughly four characters per token plus a few tokens of per-message overhead
+    return len(message["content"]) // 4 + 4
+
+
+class ConversationHistory:
+    """Message history that keeps GPT requests under a token budget.
+
+    The system prompt and the most recent messages are always sent verbatim. Once a request would go over
+    `max_tokens`, older messages are folded into a rolling summary by a background call to `summarize`,
+    which takes the messages of a summary request and returns a Future of the chat completion response.
+    """
+
+    def __init__(self, system_prompt: str, summarize, max_tokens: int = 2000, keep_recent: int = 6):
+        self.system = {"role": "system", "content": system_prompt}
+        self.messages = []  # the full transcript, without the system prompt
+        self.summary = None
+        self.summarize = summarize
+        self.max_tokens = max_tokens
+        self.keep_recent = keep_recent
+        self._tokens = []  # token count of every message in self.messages
+        self._compacted = 0  # messages[:_compacted] are covered by the summary
+        self._summarizing = False
+        self._lock = threading.RLock()  # summary callbacks may run inline on an already finished future
+
+    def append(self, role: str, content: str):
+        message = {"role": role, "content": content}
+        with self._lock:
+            self.messages.append(message)
+            self._tokens.append(count_tokens(message))
+            if self._request_tokens(self._compacted) > self.max_tokens:
+                self._compact()
+
+    def pop(self) -> dict:
+        with self._lock:
+            self._tokens.pop()
+            message = self.messages.pop()
+            self._compacted = min(self._compacted, len(self.messages))
+            return message
+
+    def request_messages(self) -> list:
+        """The messages to send: system prompt, summary of older turns and the recent turns."""
+        with self._lock:
+            start = self._compacted
+            # while a summary is still being written, leave out the oldest turns rather than go over budget
+            while self._request_tokens(start) > self.max_tokens and len(self.messages) - start > self.keep_recent:
+                start += 1
+            messages = [self.system]
+            if self.summary:
+                messages.append(self._summary_message())
+            return messages + self.messages[start:]
+
+    def _summary_message(self) -> dict:
+        return {"role": "system", "content": "Summary of the earlier conversation: " + self.summary}
+
+    def _request_tokens(self, start: int) -> int:
+        tokens = count_tokens(self.system) + sum(self._tokens[start:])
+        if self.summary:
+            tokens += count_tokens(self._summary_message())
+        return tokens
+
+    def _compact(self):
+        end = len(self.messages) - self.keep_recent
+        if self._summarizing or end <= self._compacted:
+            return
+        self._summarizing = True
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in self.messages[self._compacted:end])
+        if self.summary:
+            transcript = f"Earlier summary: {self.summary}\n\n{transcript}"
+        request = [
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": transcript},
+        ]
+        self.summarize(request).add_done_callback(lambda future: self._on_summary(future, end))
+
+    def _on_summary(self, future, end: int):
+        try:
+            response = future.result()
+            response.raise_for_status()
+            summary = response.json()["choices"][0]["message"]["content"]
+        except Exception as e:
+            # keep the messages verbatim, the next append tries again
+            logger.warning('SUMMARY_FAILED:' + str(e))
+            with self._lock:
+                self._summarizing = False
+            return
+        with self._lock:
+            self.summary = summary
+            self._compacted = min(end, len(self.messages))
+            self._summarizing = False
@@ -0,0 +1,60 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# status codes worth another attempt: rate limiting and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# longest Retry-After we wait for, a turn should fail fast rather than hang for minutes
+MAX_RETRY_AFTER = 5
+
+
+class CappedRetry(Retry):
+    """Retry that follows Retry-After only up to MAX_RETRY_AFTER seconds."""
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER)
+        return None
+
+
+class HTTPClient:
+    """Shared keep-alive session for the GPT and TTS endpoints with timeouts and retries."""
+
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 30, retries: int = 3,
+                 backoff_factor: float = 0.5, pool_maxsize: int = 20, max_workers: int = 8):
+        self.timeout = (connect_timeout, read_timeout)
+        # only retry what is safe for a POST and quick to find out: refused connections and 429/5xx answers;
+        # a read timeout already cost `read_timeout` seconds and may have been processed, so it is not repeated
+        retry = CappedRetry(
+            total=retries,
+            connect=retries,
+            read=0,
+            other=0,
+            status=retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=None,  # both endpoints are POST only
+            respect_retry_after_header=True,
+            raise_on_status=False,  # hand the last response back so raise_for_status reports it
+        )
+        adapter = HTTPAdapter(pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="http")
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """Run `fn` (e.g. a call to `post`) on the client's worker threads, so requests can overlap."""
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,52 @@
+import argparse
+import glob
+import json
+import math
+
+from telemetry import STAGES
+
+
+def percentile(values: list, p: float) -> float:
+    # nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def load_records(paths: list) -> list:
+    # stages logged later for the same turn (see telemetry.log_stage) are merged into its record
+    records = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    records.setdefault(record["turn_id"], {}).update(record)
+    return list(records.values())
+
+
+def print_report(records: list):
+    """Print one row of p50/p95/p99 per stage, in milliseconds."""
+    print(f"{'stage':<16}{'n':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage in STAGES:
+        values = [record[stage] for record in records if record.get(stage) is not None]
+        if values:
+            print(f"{stage:<16}{len(values):>6}" + "".join(f"{percentile(values, p):>10.0f}" for p in (50, 95, 99)))
+        else:
+            print(f"{stage:<16}{0:>6}" + f"{'-':>10}" * 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print per-stage latency percentiles from the turn logs.")
+    parser.add_argument("paths", nargs="*", help="turn log files (default: turns.jsonl and its rotated backups)")
+    parser.add_argument("--since", type=float, help="only turns after this unix timestamp, e.g. the last deploy")
+    args = parser.parse_args()
+
+    records = load_records(args.paths or sorted(glob.glob("turns.jsonl*")))
+    if args.since:
+        records = [record for record in records if record.get("ts", 0) >= args.since]
+    print(f"{len(records)} turns")
+    print_report(records)
+
+
+if __name__ == "__main__":
+    main()
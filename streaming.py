@@ -0,0 +1,89 @@
+import json
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from http_client import HTTPClient
+
+# a sentence ends with terminal punctuation (optionally followed by closing quotes/brackets) and whitespace
+SENTENCE_BOUNDARY = re.compile(r'[.!?…]+["\'”’)\]]*\s+')
+# shorter sentences are joined with the next one, so a stray fragment is not its own TTS request
+MIN_SENTENCE_CHARS = 20
+# periods that rarely end a sentence: titles, "e.g."/"i.e." and list markers, i.e. a number standing alone
+# at the start of a line or sentence; "at 10:45." or "costs 120." still end one
+NOT_A_BOUNDARY = re.compile(r'(?:\b(?:Mr|Mrs|Ms|Dr|St|vs|e\.g|i\.e)|(?:^|\n|[.!?:]\s)\s*\d+)\.$', re.IGNORECASE)
+
+
+def stream_chat_completion(client: HTTPClient, endpoint: str, headers: dict, messages: list):
+    """Yield the content deltas of a streamed chat completion as they arrive."""
+    payload = {
+        "messages": messages,
+        "stream": True,
+    }
+    with client.post(endpoint, headers=headers, json=payload, stream=True) as response:
+        response.raise_for_status()
+        # raw bytes: without a charset requests would decode text/event-stream as ISO-8859-1, json.loads reads UTF-8
+        for line in response.iter_lines():
+            # server-sent events: one "data: {...}" line per chunk, blank lines in between
+            if not line or not line.startswith(b"data:"):
+                continue
+            data = line[len(b"data:"):].strip()
+            if data == b"[DONE]":
+                continue  # read on to the end of the stream so the connection goes back to the pool
+            # the first chunk may only carry content filter results and no choices
+            choices = json.loads(data).get("choices") or []
+            if choices:
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    yield content
+
+
+def split_sentences(chunks, min_chars: int = MIN_SENTENCE_CHARS):
+    """Regroup streamed text chunks into complete sentences of at least `min_chars` characters."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(buffer):
+            sentence = buffer[start:match.end()].strip()
+            if len(sentence) < min_chars or NOT_A_BOUNDARY.search(sentence):
+                continue  # keep it for the next boundary rather than speak a fragment
+            yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+    if buffer.strip():
+        yield buffer.strip()
+
+
+def speak_pipelined(sentences, synthesize, play, max_workers: int = 2) -> str:
+    """Synthesize sentences as soon as they are complete and play the audio in order.
+
+    Sentences are consumed on a background thread, so later ones are generated while earlier
+    ones are playing. `play` is always called on the calling thread. Returns the full text.
+    """
+    pending = queue.Queue()
+    done = object()
+
+    def produce(executor):
+        try:
+            for sentence in sentences:
+                pending.put((sentence, executor.submit(synthesize, sentence)))
+        except Exception as e:
+            pending.put(e)
+        finally:
+            pending.put(done)
+
+    spoken = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        producer = threading.Thread(target=produce, args=(executor,), daemon=True)
+        producer.start()
+        while (item := pending.get()) is not done:
+            if isinstance(item, Exception):
+                producer.join()
+                raise item
+            sentence, audio = item
+            play(audio.result())
+            spoken.append(sentence)
+        producer.join()
+    return " ".join(spoken)
@@ -0,0 +1,116 @@
+import json
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+turn_logger = logging.getLogger("turns")
+
+# stage durations in every turn record, in the order the report prints them
+STAGES = ["queue_ms", "cue_ms", "gpt_ttft_ms", "gpt_total_ms", "tts_ttfb_ms", "tts_first_ms", "tts_total_ms", "first_audio_ms", "end_to_end_ms"]
+
+
+def setup_logging(study_log: str = "study.log", turns_log: str = "turns.jsonl", max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5) -> QueueListener:
+    """Send study.log and per-turn timing records through a queue so logging never blocks a turn.
+
+    Turn records go to `turns_log` as one JSON object per line, rotated every `max_bytes`.
+    Returns the started listener that writes both files from its own thread.
+    """
+    study_handler = logging.FileHandler(study_log, encoding="utf-8")
+    study_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    turns_handler = RotatingFileHandler(turns_log, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+    turns_handler.setFormatter(logging.Formatter("%(message)s"))
+    turns_handler.addFilter(lambda record: record.name == turn_logger.name)
+    study_handler.addFilter(lambda record: record.name != turn_logger.name)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, study_handler, turns_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+class TurnTimer:
+    """Collects the stage timings of one assistant turn.
+
+    Marks are milliseconds since `stt_at`, the time.perf_counter() value when the STT result arrived (default now).
+    """
+
+    def __init__(self, turn_id: str, stt_at: float = None):
+        self.turn_id = turn_id
+        self._start = time.perf_counter() if stt_at is None else stt_at
+        self.started_at = time.time() - (time.perf_counter() - self._start)
+        self.marks = {"stt": 0.0}
+        self.fields = {}
+        self.tts_calls = []  # start, end and time to first byte (network calls only) of every TTS call, in ms
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def mark(self, name: str):
+        """Record the first time `name` happened."""
+        with self._lock:
+            self.marks.setdefault(name, self.elapsed_ms())
+
+    def timed_tts(self, synthesize):
+        """Wrap `synthesize(text, on_response=...)` so the start, end and time to first byte of every call are recorded."""
+        def timed(text: str) -> bytes:
+            call = {"start": self.elapsed_ms(), "ttfb": None}
+
+            def on_response(response):
+                # requests measures `elapsed` up to the response headers
+                call["ttfb"] = response.elapsed.total_seconds() * 1000
+
+            try:
+                return synthesize(text, on_response=on_response)
+            finally:
+                call["end"] = self.elapsed_ms()
+                with self._lock:
+                    self.tts_calls.append(call)
+        return timed
+
+    def timed_stream(self, chunks):
+        """Wrap the streamed GPT response to mark its first token and its end."""
+        for chunk in chunks:
+            self.mark("gpt_first_token")
+            yield chunk
+        self.mark("gpt_done")
+
+    def record(self) -> dict:
+        marks = self.marks
+        # the first sentence is the call that started first; calls overlap, so the total is their wall-clock span
+        calls = sorted(self.tts_calls, key=lambda call: call["start"])
+        first_call = calls[0] if calls else None
+        ttfbs = [round(call["ttfb"], 1) for call in calls if call["ttfb"] is not None]
+
+        def between(start, end):
+            if start in marks and end in marks:
+                return round(marks[end] - marks[start], 1)
+
+        return {
+            "turn_id": self.turn_id,
+            "ts": self.started_at,
+            "queue_ms": between("stt", "worker_start"),
+            "gpt_ttft_ms": between("gpt_request", "gpt_first_token"),
+            "gpt_total_ms": between("gpt_request", "gpt_done"),
+            "tts_ttfb_ms": ttfbs[0] if ttfbs else None,
+            "tts_ttfb_calls_ms": ttfbs,
+            "tts_first_ms": round(first_call["end"] - first_call["start"], 1) if first_call else None,
+            "tts_total_ms": round(max(call["end"] for call in calls) - first_call["start"], 1) if first_call else None,
+            "first_audio_ms": between("stt", "first_audio"),
+            "end_to_end_ms": between("stt", "done"),
+            **self.fields,
+        }
+
+    def emit(self):
+        self.mark("done")
+        turn_logger.info(json.dumps(self.record()))
+
+
+def log_stage(turn_id: str, stage: str, ms: float):
+    """Log a stage measured after the turn record was written, e.g. in the browser; the report merges it by turn id."""
+    turn_logger.info(json.dumps({"turn_id": turn_id, stage: round(ms, 1)}))
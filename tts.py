@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+
+from http_client import HTTPClient
+
+MODEL = "tts-1"
+VOICE = "alloy"
+
+
+class TTSCache:
+    """Synthesized speech keyed by (model, voice, text): an in-memory LRU in front of a size-bounded directory."""
+
+    def __init__(self, directory: str = "tts_cache", memory_items: int = 256, max_disk_bytes: int = 100 * 1024 * 1024):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._disk_bytes = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".mp3"))
+
+    @staticmethod
+    def key(model: str, voice: str, text: str) -> str:
+        return hashlib.sha256(json.dumps([model, voice, text.strip()]).encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".mp3")
+
+    def get(self, key: str):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits["memory"] += 1
+                self._touch(key)
+                return self._memory[key]
+        try:
+            with open(self._path(key), "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self._touch(key)
+            self.hits["disk"] += 1
+            self._remember(key, audio)
+        return audio
+
+    def put(self, key: str, audio: bytes):
+        # write to a temporary file first so readers never see a partial mp3
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        with self._lock:
+            if os.path.exists(self._path(key)):
+                self._disk_bytes -= os.path.getsize(self._path(key))
+            os.replace(tmp_path, self._path(key))
+            self._disk_bytes += len(audio)
+            self._remember(key, audio)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _touch(self, key: str):
+        # disk eviction goes by modification time, so every hit counts, memory hits included;
+        # otherwise the most used phrases are the first to leave the disk
+        try:
+            os.utime(self._path(key))
+        except FileNotFoundError:
+            pass  # evicted from disk, still in memory
+
+    def _remember(self, key: str, audio: bytes):
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        # drop the least recently used files until we are back under the limit
+        entries = sorted((entry for entry in os.scandir(self.directory) if entry.name.endswith(".mp3")),
+                         key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if self._disk_bytes <= self.max_disk_bytes:
+                break
+            size = entry.stat().st_size
+            os.remove(entry.path)
+            self._disk_bytes -= size
+
+
+def text_to_speech(client: HTTPClient, endpoint: str, api_key: str, text: str, model: str = MODEL, voice: str = VOICE,
+                   cache: TTSCache = None, slots: threading.Semaphore = None, on_response=None) -> bytes:
+    """Synthesize `text`, going to the network only on a cache miss.
+
+    `slots` bounds how many requests run against the endpoint at once; cache hits do not take one.
+    `on_response(response)` is called with every response from the endpoint, e.g. for its timing.
+    """
+    if cache is not None:
+        key = TTSCache.key(model, voice, text)
+        audio = cache.get(key)
+        if audio is not None:
+            return audio
+
+    # send request for text-to-speech output
+    headers = {
+        "Content-Type": "application/json",
+        "api-key": api_key,
+    }
+    payload = {
+        "model": model,
+        "voice": voice,
+        "input": text,
+    }
+    with slots or nullcontext():
+        audio_response = client.post(endpoint, headers=headers, json=payload)
+    if on_response is not None:
+        on_response(audio_response)
+    audio_response.raise_for_status()  # Will raise an HTTPError if the HTTP request returned an unsuccessful status code
+
+    if cache is not None:
+        cache.put(key, audio_response.content)
+    return audio_response.content
@@ -0,0 +1,148 @@
+import io
+import itertools
+import logging
+import threading
+
+import requests
+from mutagen.mp3 import MP3
+
+from history import ConversationHistory
+from http_client import HTTPClient
+from streaming import speak_pipelined, split_sentences, stream_chat_completion
+from telemetry import TurnTimer
+from tts import TTSCache, text_to_speech
+
+logger = logging.getLogger(__name__)
+
+ERROR_MESSAGE = "Sorry, something went wrong. Could you repeat that, please?"
+WAIT_MESSAGE = "Please wait a moment, I am busy with other requests. Try again in a few seconds."
+
+
+def audio_duration(audio: bytes) -> float:
+    return MP3(io.BytesIO(audio)).info.length
+
+
+def cue_clip_id(turn_id: str) -> str:
+    # the feedback cue is the first clip of every turn
+    return f"{turn_id}-0"
+
+
+def limited(slots: threading.Semaphore, chunks):
+    # hold an endpoint slot for as long as the response is streaming
+    with slots:
+        yield from chunks
+
+
+class TurnPipeline:
+    """One assistant turn: feedback cue, GPT request and TTS of the reply, independent of Streamlit.
+
+    Audio is handed to `enqueue(audio, clip_id)` as soon as it is ready and `end_turn(turn_id)` is called
+    once the turn is complete, so the same pipeline drives the browser queue in the app and the benchmark.
+    `gpt_concurrency` and `tts_concurrency` cap the requests in flight to each endpoint across all turns.
+    """
+
+    def __init__(self, http_client: HTTPClient, tts_cache: TTSCache, gpt_endpoint: str, tts_endpoint: str,
+                 api_key: str, cue_audio: bytes, stream: bool = True, gpt_concurrency: int = 8, tts_concurrency: int = 16):
+        self.http_client = http_client
+        self.tts_cache = tts_cache
+        self.gpt_endpoint = gpt_endpoint
+        self.tts_endpoint = tts_endpoint
+        self.api_key = api_key
+        self.cue_audio = cue_audio
+        self.stream = stream
+        self.gpt_slots = threading.BoundedSemaphore(gpt_concurrency)
+        self.tts_slots = threading.BoundedSemaphore(tts_concurrency)
+        self._wait_audio = None
+        self.headers = {
+            "Content-Type": "application/json",
+            "api-key": api_key,
+        }
+
+    def complete(self, messages: list):
+        with self.gpt_slots:
+            return self.http_client.post(self.gpt_endpoint, headers=self.headers, json={"messages": messages})
+
+    def summarize(self, messages: list):
+        return self.http_client.submit(self.complete, messages)
+
+    def synthesize(self, text: str, on_response=None) -> bytes:
+        return text_to_speech(self.http_client, self.tts_endpoint, self.api_key, text, cache=self.tts_cache,
+                              slots=self.tts_slots, on_response=on_response)
+
+    def prepare_wait_cue(self):
+        """Synthesize WAIT_MESSAGE in the background, normally a phrase bank cache hit."""
+        self._wait_audio = self.http_client.submit(self.synthesize, WAIT_MESSAGE)
+
+    def wait_cue(self) -> bytes:
+        """The wait cue if it is ready, else None; shedding a turn never waits for the network."""
+        if self._wait_audio is None or not self._wait_audio.done():
+            return None
+        if self._wait_audio.exception() is not None:
+            logger.error('ERROR:' + str(self._wait_audio.exception()))
+            self.prepare_wait_cue()  # try again in the background for the next shed turn
+            return None
+        return self._wait_audio.result()
+
+    def run(self, turn_id: str, history: ConversationHistory, text: str, enqueue, end_turn, stt_at: float = None) -> str:
+        """Answer `text` out loud; returns the reply, or None if it could not be answered.
+
+        `stt_at` is the time.perf_counter() value when the STT result arrived, so time spent waiting
+        for a worker counts towards the turn.
+        """
+        timer = TurnTimer(turn_id, stt_at)
+        timer.mark("worker_start")
+
+        # the cue plays in the browser while the request below is already running
+        enqueue(self.cue_audio, cue_clip_id(turn_id))
+        clip_ids = (f"{turn_id}-{i}" for i in itertools.count(1))
+
+        # add message to the history
+        history.append("user", text)
+
+        synthesize = timer.timed_tts(self.synthesize)
+        spoken = []
+
+        def play(audio: bytes):
+            spoken.append(audio)
+            enqueue(audio, next(clip_ids))
+            timer.mark("first_audio")
+
+        response_message = None
+        try:
+            # send request, speaking every sentence as soon as it is complete when streaming
+            messages = history.request_messages()
+            timer.mark("gpt_request")
+            if self.stream:
+                chunks = stream_chat_completion(self.http_client, self.gpt_endpoint, self.headers, messages)
+                sentences = split_sentences(timer.timed_stream(limited(self.gpt_slots, chunks)))
+            else:
+                response = self.complete(messages)
+                response.raise_for_status()  # Will raise an HTTPError if the HTTP request returned an unsuccessful status code
+                sentences = [response.json()["choices"][0]["message"]["content"]]
+                timer.mark("gpt_first_token")
+                timer.mark("gpt_done")
+            response_message = speak_pipelined(sentences, synthesize, play)
+
+            # add message to the history
+            history.append("assistant", response_message)
+            timer.fields.update({
+                "sentences": len(spoken),
+                "audio_bytes": sum(map(len, spoken)),
+                "audio_seconds": round(sum(map(audio_duration, spoken)), 2),
+                "tts_cache": self.tts_cache.stats(),
+            })
+        except Exception as e:
+            # anything other than a failed request is a bug, keep its traceback
+            logger.error('ERROR:' + str(e), exc_info=not isinstance(e, requests.RequestException))
+            if response_message is None:
+                # keep the session alive: drop the unanswered question and ask the user to try again
+                history.pop()
+                try:
+                    play(synthesize(ERROR_MESSAGE))
+                except Exception as e:
+                    logger.error('ERROR:' + str(e))
+            timer.fields["error"] = True
+
+        end_turn(turn_id)
+        timer.emit()
+        return response_message
@@ -0,0 +1,79 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class SessionBusy(Exception):
+    """The session already has a turn in flight."""
+
+
+class Overloaded(Exception):
+    """Every worker is busy and the queue is full."""
+
+
+class TurnJob:
+    """A turn running on a worker; collects its audio until the script thread picks it up."""
+
+    def __init__(self, turn_id: str):
+        self.turn_id = turn_id
+        self.future = None
+        self.ended = False
+        self.delivered = None  # what the UI had already put on the page at its last poll
+        self.shown = False  # the UI has rerun for the finished turn
+        self._clips = []
+        self._lock = threading.Lock()
+
+    def enqueue(self, audio: bytes, clip_id: str):
+        with self._lock:
+            self._clips.append((audio, clip_id))
+
+    def end_turn(self, turn_id: str):
+        self.ended = True
+
+    def clips(self) -> list:
+        with self._lock:
+            return list(self._clips)
+
+    def done(self) -> bool:
+        return self.future.done()
+
+
+class TurnWorkers:
+    """Bounded pool for assistant turns shared by all sessions.
+
+    At most one turn per session is in flight, and at most `max_workers + max_queued` turns overall;
+    past that `submit` raises instead of letting the backlog grow.
+    """
+
+    def __init__(self, max_workers: int = 8, max_queued: int = 16):
+        self.capacity = max_workers + max_queued
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="turn")
+        self._active = {}  # session id -> job in flight
+        self._lock = threading.Lock()
+
+    def submit(self, session_id: str, turn_id: str, run) -> TurnJob:
+        """Run `run(job)` on a worker; raises SessionBusy or Overloaded instead of queueing a second turn."""
+        with self._lock:
+            if session_id in self._active:
+                raise SessionBusy(session_id)
+            if len(self._active) >= self.capacity:
+                raise Overloaded(f"{len(self._active)} turns in flight")
+            job = TurnJob(turn_id)
+            self._active[session_id] = job
+        job.future = self._executor.submit(run, job)
+        job.future.add_done_callback(lambda future: self._finish(session_id, future))
+        return job
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._active)
+
+    def _finish(self, session_id: str, future: Future):
+        with self._lock:
+            self._active.pop(session_id, None)
+        # nothing else ever reads the result, so a turn that crashed would otherwise leave no trace
+        error = future.exception()
+        if error is not None:
+            logger.error('TURN_FAILED:' + str(error), exc_info=error)